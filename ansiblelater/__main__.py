@@ -9,6 +9,7 @@ from ansiblelater import LOG, __version__, logger
 from ansiblelater.candidate import Candidate
 from ansiblelater.settings import Settings
 from ansiblelater.standard import SingleStandards
+from ansiblelater.utils import yamlhelper
 
 
 def main():
@@ -66,9 +67,8 @@ def main():
 
     logger.update_logger(LOG, config["logging"]["level"], config["logging"]["json"])
     SingleStandards(config["rules"]["standards"])
+    yamlhelper.clear_caches()
 
-    workers = max(multiprocessing.cpu_count() - 2, 2)
-    p = multiprocessing.Pool(workers)
     tasks = []
     for filename in config["rules"]["files"]:
         candidate = Candidate.classify(filename, settings)
@@ -85,9 +85,15 @@ def main():
         else:
             LOG.info(f"Couldn't classify file {filename}")
 
-    errors = sum(p.map(_review_wrapper, tasks))
-    p.close()
-    p.join()
+    if len(tasks) < 2:
+        # not worth forking a pool for a single candidate
+        errors = sum(_review_wrapper(task) for task in tasks)
+    else:
+        workers = max(multiprocessing.cpu_count() - 2, 2)
+        p = multiprocessing.Pool(min(workers, len(tasks)))
+        errors = sum(p.map(_review_wrapper, tasks))
+        p.close()
+        p.join()
 
     return_code = 1 if errors != 0 else 0
 
@@ -5,12 +5,12 @@ import copy
 import os
 import re
 
-from ansible.plugins.loader import module_loader
 from packaging.version import Version
 
 from ansiblelater import LOG, utils
 from ansiblelater.logger import flag_extra
 from ansiblelater.standard import SingleStandards, StandardBase
+from ansiblelater.utils.yamlhelper import get_module_loader
 
 
 class Candidate:
@@ -212,7 +212,7 @@ class RoleFile(Candidate):
         while parentdir != os.path.dirname(parentdir):
             role_modules = os.path.join(parentdir, "library")
             if os.path.exists(role_modules):
-                module_loader.add_directory(role_modules)
+                get_module_loader().add_directory(role_modules)
                 break
             parentdir = os.path.dirname(parentdir)
 
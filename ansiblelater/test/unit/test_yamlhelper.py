@@ -0,0 +1,78 @@
+"""Test yamlhelper module."""
+
+import io
+
+import pytest
+
+from ansiblelater.exceptions import LaterAnsibleError
+from ansiblelater.utils import yamlhelper
+
+
+def test_tokenize_include():
+    command, args, kwargs = yamlhelper.tokenize("- include: tasks/main.yml tags=a,b")
+
+    assert command == "include"
+    assert args == ["tasks/main.yml", "tags=a,b"]
+    assert kwargs == {}
+
+
+def test_tokenize_action():
+    command, args, kwargs = yamlhelper.tokenize("action: copy src=a dest=b")
+
+    assert command == "copy"
+    assert args == []
+    assert kwargs == {"src": "a", "dest": "b"}
+
+
+def test_tokenize_local_action():
+    command, args, kwargs = yamlhelper.tokenize("local_action: shell echo hi creates=/tmp/x")
+
+    assert command == "shell"
+    assert args == ["echo", "hi", "creates=/tmp/x"]
+    assert kwargs == {}
+
+
+def test_tokenize_empty_line():
+    assert yamlhelper.tokenize("") == ("", [], {})
+    assert yamlhelper.tokenize("   ") == ("", [], {})
+    assert yamlhelper.tokenize("- ") == ("", [], {})
+    assert yamlhelper.tokenize("action: ") == ("", [], {})
+
+
+def test_normalize_task_unresolvable_module():
+    data = io.StringIO("- name: demo\n  not_a_later_module: foo=bar\n")
+    tasks = yamlhelper.parse_yaml_linenumbers(data, "tasks/main.yml")
+
+    with pytest.raises(LaterAnsibleError) as e:
+        yamlhelper.normalize_task(tasks[0], "tasks/main.yml")
+
+    assert e.value.message.startswith("couldn't resolve module/action 'not_a_later_module'")
+
+
+def test_rolename():
+    assert yamlhelper.rolename("project/roles/demo/tasks/main.yml") == "demo"
+    assert yamlhelper.rolename("roles/demo") == "demo"
+    assert yamlhelper.rolename("playbook.yml") == ""
+
+
+def test_normalized_yaml(tmp_path):
+    f = tmp_path / "main.yml"
+    f.write_text("---\n# comment\n\n- name: demo task\n  debug:\n", encoding="utf-8")
+
+    lines = yamlhelper.normalized_yaml(str(f), {"remove_markers": True, "remove_empty": True})
+
+    assert lines == [(4, "- name: demo task\n"), (5, "  debug:\n")]
+
+
+def test_normalized_yaml_keeps_markers(tmp_path):
+    f = tmp_path / "main.yml"
+    f.write_text("---\n# comment\n\n- name: demo task\n  debug:\n", encoding="utf-8")
+
+    lines = yamlhelper.normalized_yaml(str(f), {})
+
+    assert lines == [
+        (1, "---\n"),
+        (3, "\n"),
+        (4, "- name: demo task\n"),
+        (5, "  debug:\n"),
+    ]
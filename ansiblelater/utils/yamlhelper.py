@@ -20,8 +20,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-import codecs
+import functools
 import os
+import re
 from contextlib import suppress
 
 import ansible.parsing.mod_args
@@ -45,77 +46,143 @@ except ImportError:
     # Fallback on the Ansible 1.9 module
     from ansible.module_utils.splitter import split_args
 
+try:
+    # If PyYAML ships the LibYAML bindings, Ansible builds its loader on top of
+    # the C parser which exposes line numbers through node marks already.
+    from yaml.cyaml import CParser
 
-def parse_yaml_from_file(filepath):
+    HAS_LIBYAML_LOADER = issubclass(AnsibleLoader, CParser)
+except ImportError:
+    HAS_LIBYAML_LOADER = False
+
+
+@functools.lru_cache(maxsize=None)
+def _data_loader(basedir=None):
     dl = DataLoader()
-    return dl.load_from_file(filepath)
+    if basedir is not None:
+        dl.set_basedir(basedir)
+    return dl
+
+
+@functools.lru_cache(maxsize=None)
+def _templar(basedir):
+    return Templar(_data_loader(basedir))
+
+
+@functools.lru_cache(maxsize=8192)
+def _isdir(path):
+    return os.path.isdir(path)
+
+
+@functools.lru_cache(maxsize=8192)
+def _exists(path):
+    return os.path.exists(path)
+
+
+def clear_caches():
+    """Reset memoized Ansible loader and filesystem state between lint invocations."""
+    _data_loader.cache_clear()
+    _templar.cache_clear()
+    _isdir.cache_clear()
+    _exists.cache_clear()
+    _rolepath.cache_clear()
+    _look_for_role_files.cache_clear()
+
+
+def parse_yaml_from_file(filepath):
+    return _data_loader().load_from_file(filepath)
 
 
 def path_dwim(basedir, given):
-    dl = DataLoader()
-    dl.set_basedir(basedir)
-    return dl.path_dwim(given)
+    return _data_loader(basedir).path_dwim(given)
 
 
 def ansible_template(basedir, varname, templatevars, **kwargs):
-    dl = DataLoader()
-    dl.set_basedir(basedir)
-    templar = Templar(dl, variables=templatevars)
+    templar = _templar(basedir)
+    templar.available_variables = templatevars
     return templar.template(varname, **kwargs)
 
 
-try:
-    from ansible.plugins import module_loader
-except ImportError:
-    from ansible.plugins.loader import init_plugin_loader, module_loader
+_module_loader = None
+
+
+def get_module_loader():
+    """Import the Ansible module loader on first use; plugin discovery is expensive."""
+    global _module_loader
+    if _module_loader is None:
+        try:
+            from ansible.plugins import module_loader
+        except ImportError:
+            from ansible.plugins.loader import init_plugin_loader, module_loader
+
+            init_plugin_loader()
+        _module_loader = module_loader
+    return _module_loader
 
-    init_plugin_loader()
 
 LINE_NUMBER_KEY = "__line__"
 FILENAME_KEY = "__file__"
 
-VALID_KEYS = [
-    "name",
-    "action",
-    "when",
-    "async",
-    "poll",
-    "notify",
-    "first_available_file",
-    "include",
-    "import_playbook",
-    "tags",
-    "register",
-    "ignore_errors",
-    "delegate_to",
-    "local_action",
-    "transport",
-    "remote_user",
-    "sudo",
-    "sudo_user",
-    "sudo_pass",
-    "when",
-    "connection",
-    "environment",
-    "args",
-    "always_run",
-    "any_errors_fatal",
-    "changed_when",
-    "failed_when",
-    "check_mode",
-    "delay",
-    "retries",
-    "until",
-    "su",
-    "su_user",
-    "su_pass",
-    "no_log",
-    "run_once",
-    "become",
-    "become_user",
-    "become_method",
-    FILENAME_KEY,
-]
+DEFAULT_ROLES_PATH = tuple(
+    os.path.expanduser(loc)
+    for loc in (
+        constants.DEFAULT_ROLES_PATH.split(os.pathsep)
+        if isinstance(constants.DEFAULT_ROLES_PATH, str)
+        else constants.DEFAULT_ROLES_PATH or []
+    )
+)
+
+VALID_KEYS = frozenset(
+    (
+        "name",
+        "action",
+        "when",
+        "async",
+        "poll",
+        "notify",
+        "first_available_file",
+        "include",
+        "import_playbook",
+        "tags",
+        "register",
+        "ignore_errors",
+        "delegate_to",
+        "local_action",
+        "transport",
+        "remote_user",
+        "sudo",
+        "sudo_user",
+        "sudo_pass",
+        "connection",
+        "environment",
+        "args",
+        "always_run",
+        "any_errors_fatal",
+        "changed_when",
+        "failed_when",
+        "check_mode",
+        "delay",
+        "retries",
+        "until",
+        "su",
+        "su_user",
+        "su_pass",
+        "no_log",
+        "run_once",
+        "become",
+        "become_user",
+        "become_method",
+        FILENAME_KEY,
+    )
+)
+
+_ROLE_SUBDIRS = ("tasks", "handlers", "meta")
+
+_YAML_EXTS = (".yml", ".yaml")
+
+BLOCK_RESCUE_ALWAYS = frozenset(("block", "rescue", "always"))
+
+INCLUDE_TASK_KEYS = frozenset(("include", "include_tasks", "import_playbook", "import_tasks"))
 
 BLOCK_NAME_TO_ACTION_TYPE_MAP = {
     "tasks": "task",
@@ -128,24 +195,32 @@ BLOCK_NAME_TO_ACTION_TYPE_MAP = {
 }
 
 
+_TOKEN_RE = re.compile(r"(\S+?)=(\S*)|(\S+)")
+
+_TEMPLATE_RE = re.compile(r"\$|\{\{")
+
+
 def tokenize(line):
-    tokens = line.lstrip().split(" ")
-    if tokens[0] == "-":
-        tokens = tokens[1:]
-    if tokens[0] == "action:" or tokens[0] == "local_action:":
-        tokens = tokens[1:]
-    command = tokens[0].replace(":", "")
+    tokens = _TOKEN_RE.finditer(line)
+    first = next(tokens, None)
+    if first is not None and first.group(0) == "-":
+        first = next(tokens, None)
+    if first is not None and first.group(0) in ("action:", "local_action:"):
+        first = next(tokens, None)
+    if first is None:
+        return ("", [], {})
+    command = first.group(0).replace(":", "")
 
     args = []
     kwargs = {}
     nonkvfound = False
-    for arg in tokens[1:]:
-        if "=" in arg and not nonkvfound:
-            kv = arg.split("=", 1)
-            kwargs[kv[0]] = kv[1]
+    for token in tokens:
+        key, value, _ = token.groups()
+        if key is not None and not nonkvfound:
+            kwargs[key] = value
         else:
             nonkvfound = True
-            args.append(arg)
+            args.append(token.group(0))
     return (command, args, kwargs)
 
 
@@ -160,7 +235,7 @@ def _playbook_items(pb_data):
 
 
 def find_children(playbook, playbook_dir):
-    if not os.path.exists(playbook[0]):
+    if not _exists(playbook[0]):
         return []
     if playbook[1] == "role":
         playbook_ds = {"roles": [{"role": playbook[0]}]}
@@ -174,7 +249,7 @@ def find_children(playbook, playbook_dir):
     items = _playbook_items(playbook_ds)
     for item in items:
         for child in play_children(basedir, item, playbook[1], playbook_dir):
-            if "$" in child["path"] or "{{" in child["path"]:
+            if _TEMPLATE_RE.search(child["path"]):
                 continue
             valid_tokens = []
             for token in split_args(child["path"]):
@@ -194,34 +269,23 @@ def template(basedir, value, variables, fail_on_undefined=False, **kwargs):
             os.path.abspath(basedir),
             value,
             variables,
-            **dict(kwargs, fail_on_undefined=fail_on_undefined),
+            **{**kwargs, "fail_on_undefined": fail_on_undefined},
         )
 
 
 def play_children(basedir, item, parent_type):
-    delegate_map = {
-        "tasks": _taskshandlers_children,
-        "pre_tasks": _taskshandlers_children,
-        "post_tasks": _taskshandlers_children,
-        "block": _taskshandlers_children,
-        "include": _include_children,
-        "import_playbook": _include_children,
-        "roles": _roles_children,
-        "dependencies": _roles_children,
-        "handlers": _taskshandlers_children,
-    }
     (k, v) = item
-    play_library = os.path.join(os.path.abspath(basedir), "library")
-    _load_library_if_exists(play_library)
+    abs_basedir = os.path.abspath(basedir)
+    _load_library_if_exists(os.path.join(abs_basedir, "library"))
 
-    if k in delegate_map and v:
+    if k in _DELEGATE_MAP and v:
         v = template(
-            os.path.abspath(basedir),
+            abs_basedir,
             v,
-            {"playbook_dir": os.path.abspath(basedir)},
+            {"playbook_dir": abs_basedir},
             fail_on_undefined=False,
         )
-        return delegate_map[k](basedir, k, v, parent_type)
+        return _DELEGATE_MAP[k](basedir, k, v, parent_type)
     return []
 
 
@@ -229,49 +293,58 @@ def _include_children(basedir, k, v, parent_type):
     # handle include: filename.yml tags=blah
     (command, args, kwargs) = tokenize(f"{k}: {v}")
 
-    result = path_dwim(basedir, args[0])
-    if not os.path.exists(result) and not basedir.endswith("tasks"):
+    result = path_dwim(basedir, args[0] if args else "")
+    if not _exists(result) and not basedir.endswith("tasks"):
         result = path_dwim(os.path.join(basedir, "..", "tasks"), v)
     return [{"path": result, "type": parent_type}]
 
 
+def _th_include(th, key, basedir, k, parent_type, results):
+    append_children(th[key], basedir, k, parent_type, results)
+
+
+def _th_role(th, key, basedir, k, parent_type, results):
+    results.extend(
+        _roles_children(
+            basedir,
+            k,
+            [th[key].get("name")],
+            parent_type,
+            main=th[key].get("tasks_from", "main"),
+        )
+    )
+
+
+def _th_block(th, key, basedir, k, parent_type, results):
+    results.extend(_taskshandlers_children(basedir, k, th[key], parent_type))
+    if "rescue" in th:
+        results.extend(_taskshandlers_children(basedir, k, th["rescue"], parent_type))
+    if "always" in th:
+        results.extend(_taskshandlers_children(basedir, k, th["always"], parent_type))
+
+
+# insertion order doubles as dispatch priority if a task carries several keys
+_TH_DISPATCH = {
+    "include": _th_include,
+    "include_tasks": _th_include,
+    "import_playbook": _th_include,
+    "import_tasks": _th_include,
+    "import_role": _th_role,
+    "include_role": _th_role,
+    "block": _th_block,
+}
+
+
 def _taskshandlers_children(basedir, k, v, parent_type):
     results = []
     for th in v:
-        if "include" in th:
-            append_children(th["include"], basedir, k, parent_type, results)
-        elif "include_tasks" in th:
-            append_children(th["include_tasks"], basedir, k, parent_type, results)
-        elif "import_playbook" in th:
-            append_children(th["import_playbook"], basedir, k, parent_type, results)
-        elif "import_tasks" in th:
-            append_children(th["import_tasks"], basedir, k, parent_type, results)
-        elif "import_role" in th:
-            results.extend(
-                _roles_children(
-                    basedir,
-                    k,
-                    [th["import_role"].get("name")],
-                    parent_type,
-                    main=th["import_role"].get("tasks_from", "main"),
-                )
-            )
-        elif "include_role" in th:
-            results.extend(
-                _roles_children(
-                    basedir,
-                    k,
-                    [th["include_role"].get("name")],
-                    parent_type,
-                    main=th["include_role"].get("tasks_from", "main"),
-                )
-            )
-        elif "block" in th:
-            results.extend(_taskshandlers_children(basedir, k, th["block"], parent_type))
-            if "rescue" in th:
-                results.extend(_taskshandlers_children(basedir, k, th["rescue"], parent_type))
-            if "always" in th:
-                results.extend(_taskshandlers_children(basedir, k, th["always"], parent_type))
+        if not isinstance(th, dict):
+            continue
+        keys = _TH_DISPATCH.keys() & th.keys()
+        if not keys:
+            continue
+        key = next(d for d in _TH_DISPATCH if d in keys) if len(keys) > 1 else keys.pop()
+        _TH_DISPATCH[key](th, key, basedir, k, parent_type, results)
     return results
 
 
@@ -301,11 +374,25 @@ def _roles_children(basedir, k, v, parent_type, main="main"):  # noqa
     return results
 
 
+_DELEGATE_MAP = {
+    "tasks": _taskshandlers_children,
+    "pre_tasks": _taskshandlers_children,
+    "post_tasks": _taskshandlers_children,
+    "block": _taskshandlers_children,
+    "include": _include_children,
+    "import_playbook": _include_children,
+    "roles": _roles_children,
+    "dependencies": _roles_children,
+    "handlers": _taskshandlers_children,
+}
+
+
 def _load_library_if_exists(path):
-    if os.path.exists(path):
-        module_loader.add_directory(path)
+    if _exists(path):
+        get_module_loader().add_directory(path)
 
 
+@functools.lru_cache(maxsize=4096)
 def _rolepath(basedir, role):
     role_path = None
 
@@ -318,16 +405,11 @@ def _rolepath(basedir, role):
         path_dwim(basedir, os.path.join("..", "..", role)),
     ]
 
-    if constants.DEFAULT_ROLES_PATH:
-        search_locations = constants.DEFAULT_ROLES_PATH
-        if isinstance(search_locations, str):
-            search_locations = search_locations.split(os.pathsep)
-        for loc in search_locations:
-            loc = os.path.expanduser(loc)
-            possible_paths.append(path_dwim(loc, role))
+    for loc in DEFAULT_ROLES_PATH:
+        possible_paths.append(path_dwim(loc, role))
 
     for path_option in possible_paths:
-        if os.path.isdir(path_option):
+        if _isdir(path_option):
             role_path = path_option
             break
 
@@ -337,6 +419,7 @@ def _rolepath(basedir, role):
     return role_path
 
 
+@functools.lru_cache(maxsize=4096)
 def _look_for_role_files(basedir, role, main="main"):
     role_path = _rolepath(basedir, role)
     if not role_path:
@@ -344,53 +427,56 @@ def _look_for_role_files(basedir, role, main="main"):
 
     results = []
 
-    for th in ["tasks", "handlers", "meta"]:
-        for ext in (".yml", ".yaml"):
+    for th in _ROLE_SUBDIRS:
+        for ext in _YAML_EXTS:
             thpath = os.path.join(role_path, th, main + ext)
-            if os.path.exists(thpath):
+            if _exists(thpath):
                 results.append({"path": thpath, "type": th})
                 break
     return results
 
 
 def rolename(filepath):
-    idx = filepath.find("roles/")
-    if idx < 0:
+    _, sep, tail = filepath.partition("roles/")
+    if not sep:
         return ""
-    role = filepath[idx + 6 :]
-    return role[: role.find("/")]
+    return tail.partition("/")[0]
 
 
 def _kv_to_dict(v):
     (command, args, kwargs) = tokenize(v)
-    return dict(__ansible_module__=command, __ansible_arguments__=args, **kwargs)
+    return {"__ansible_module__": command, "__ansible_arguments__": args, **kwargs}
+
+
+@functools.lru_cache(maxsize=8)
+def _ensure_builtin_tasks(custom_modules):
+    """Register custom modules with the Ansible module args parser once per module set."""
+    # ModuleArgsParser routes unknown modules through the collection loader,
+    # which only works once the plugin loader has been initialized.
+    get_module_loader()
+    merged = ansible.parsing.mod_args.BUILTIN_TASKS | frozenset(custom_modules)
+    if merged != ansible.parsing.mod_args.BUILTIN_TASKS:
+        ansible.parsing.mod_args.BUILTIN_TASKS = merged
 
 
 def normalize_task(task, filename, custom_modules=None):
     """Ensure tasks have an action key and strings are converted to python objects."""
 
     if custom_modules is None:
-        custom_modules = []
+        custom_modules = ()
 
     ansible_action_type = task.get("__ansible_action_type__", "task")
     if "__ansible_action_type__" in task:
         del task["__ansible_action_type__"]
 
     # temp. extract metadata
-    ansible_meta = {}
-    for key in ["__line__", "__file__", "__ansible_action_meta__"]:
-        default = None
-
-        if key == "__ansible_action_meta__":
-            default = {}
-
-        ansible_meta[key] = task.pop(key, default)
+    ansible_line = task.pop("__line__", None)
+    ansible_file = task.pop("__file__", None)
+    ansible_action_meta = task.pop("__ansible_action_meta__", None)
 
     normalized = {}
 
-    builtin = list(ansible.parsing.mod_args.BUILTIN_TASKS)
-    builtin = list(set(builtin + custom_modules))
-    ansible.parsing.mod_args.BUILTIN_TASKS = frozenset(builtin)
+    _ensure_builtin_tasks(tuple(custom_modules))
     mod_arg_parser = ModuleArgsParser(task)
 
     try:
@@ -424,9 +510,12 @@ def normalize_task(task, filename, custom_modules=None):
     normalized["__ansible_action_type__"] = ansible_action_type
 
     # add back extracted metadata
-    for k, v in ansible_meta.items():
-        if v:
-            normalized[k] = v
+    if ansible_line:
+        normalized["__line__"] = ansible_line
+    if ansible_file:
+        normalized["__file__"] = ansible_file
+    if ansible_action_meta:
+        normalized["__ansible_action_meta__"] = ansible_action_meta
 
     return normalized
 
@@ -441,40 +530,38 @@ def action_tasks(yaml, file):
     # Add sub-elements of block/rescue/always to tasks list
     tasks.extend(extract_from_list(tasks, ["block", "rescue", "always"]))
     # Remove block/rescue/always elements from tasks list
-    block_rescue_always = ("block", "rescue", "always")
-    tasks[:] = [task for task in tasks if all(k not in task for k in block_rescue_always)]
+    tasks[:] = [task for task in tasks if BLOCK_RESCUE_ALWAYS.isdisjoint(task)]
 
-    allowed = ["include", "include_tasks", "import_playbook", "import_tasks"]
+    return [task for task in tasks if INCLUDE_TASK_KEYS.isdisjoint(task)]
 
-    return [task for task in tasks if set(allowed).isdisjoint(task.keys())]
+
+_ACTION_INTERNAL_KEYS = ("__ansible_module__", "__ansible_arguments__")
 
 
 def task_to_str(task):
     name = task.get("name")
     if name:
         return name
-    action = task.get("action")
-    args = " ".join(
-        [
-            f"{k}={v}"
-            for (k, v) in action.items()
-            if k not in ["__ansible_module__", "__ansible_arguments__"]
-        ]
-        + action.get("__ansible_arguments__")
-    )
-    return "{} {}".format(action["__ansible_module__"], args)
+    action = task["action"]
+    parts = [f"{k}={v}" for (k, v) in action.items() if k not in _ACTION_INTERNAL_KEYS]
+    parts.extend(action.get("__ansible_arguments__", ()))
+    return f"{action['__ansible_module__']} {' '.join(parts)}"
+
+
+_BASE_META_KEYS = frozenset(("__line__", "__file__", "__ansible_action_type__"))
 
 
 def extract_from_list(blocks, candidates):
     results = []
+    delete_meta_keys = {candidate: _BASE_META_KEYS | {candidate} for candidate in candidates}
     for block in blocks:
+        if not isinstance(block, dict):
+            continue
         for candidate in candidates:
-            delete_meta_keys = [candidate, "__line__", "__file__", "__ansible_action_type__"]
-            if isinstance(block, dict) and candidate in block:
+            if candidate in block:
                 if isinstance(block[candidate], list):
-                    meta_data = dict(block)
-                    for key in delete_meta_keys:
-                        meta_data.pop(key, None)
+                    skip = delete_meta_keys[candidate]
+                    meta_data = {k: v for k, v in block.items() if k not in skip}
                     results.extend(add_action_type(block[candidate], candidate, meta_data))
                 elif block[candidate] is not None:
                     raise RuntimeError(
@@ -524,7 +611,11 @@ def parse_yaml_linenumbers(data, filename):
     try:
         kwargs = {}
         loader = AnsibleLoader(data, **kwargs)
-        loader.compose_node = compose_node
+        if not HAS_LIBYAML_LOADER:
+            # The pure-Python scanner does not record positions on the nodes,
+            # so track them while composing. With LibYAML the constructor picks
+            # the line number up from the C scanner's marks instead.
+            loader.compose_node = compose_node
         loader.construct_mapping = construct_mapping
         data = loader.get_single_data() or []
     except (
@@ -541,24 +632,24 @@ def parse_yaml_linenumbers(data, filename):
 
 def normalized_yaml(file, options):
     lines = []
-    removes = []
+    remove_markers = options.get("remove_markers")
+    remove_empty = options.get("remove_empty")
 
     try:
-        with codecs.open(file, mode="rb", encoding="utf-8") as f:
-            lines = list(enumerate(f.readlines(), start=1))
-
-        for i, line in lines:
-            if line.strip().startswith("#"):
-                removes.append((i, line))
-            # remove document starter also
-            if options.get("remove_markers") and line.strip() == "---":
-                removes.append((i, line))
-            # remove empty lines
-            if options.get("remove_empty") and not line.strip():
-                removes.append((i, line))
-
-        for line in removes:
-            lines.remove(line)
+        # Iterate the raw bytes and only decode the lines that survive the
+        # filters; bytes comparisons run in C without a per-line decode.
+        with open(file, mode="rb") as f:
+            for i, line in enumerate(f, start=1):
+                stripped = line.strip()
+                if stripped.startswith(b"#"):
+                    continue
+                # remove document starter also
+                if remove_markers and stripped == b"---":
+                    continue
+                # remove empty lines
+                if remove_empty and not stripped:
+                    continue
+                lines.append((i, line.decode("utf-8")))
     except (yaml.parser.ParserError, yaml.scanner.ScannerError) as e:
         raise LaterError("syntax error", e) from e
     return lines
@@ -567,6 +658,8 @@ def normalized_yaml(file, options):
 class UnsafeTag:
     """Handle custom yaml unsafe tag."""
 
+    __slots__ = ("unsafe",)
+
     yaml_tag = "!unsafe"
 
     def __init__(self, value):
@@ -580,6 +673,8 @@ class UnsafeTag:
 class VaultTag:
     """Handle custom yaml vault tag."""
 
+    __slots__ = ("unsafe",)
+
     yaml_tag = "!vault"
 
     def __init__(self, value):